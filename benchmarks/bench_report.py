@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Daily Report Generator Benchmark
+合成ディレクトリツリー上で DailyReportGenerator のスキャン処理を計測する
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import REPORT_SCRIPT, load_module, measure
+
+# 生成するツリーのファイル数
+SIZES = [1_000, 10_000, 50_000, 200_000]
+
+FILES_PER_DIR = 100
+EXTENSIONS = [".py", ".md", ".json", ".ts", ".sh", ".txt", ""]
+
+
+def generate_tree(root: Path, files: int) -> None:
+    """ファイル数を指定して合成ツリーを生成（半数は24時間より古いmtimeにする）"""
+    old_mtime = time.time() - 48 * 3600
+    
+    for i in range(files):
+        directory = root / f"pkg_{i // FILES_PER_DIR // FILES_PER_DIR}" / f"mod_{i // FILES_PER_DIR}"
+        if i % FILES_PER_DIR == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        
+        file_path = directory / f"file_{i}{EXTENSIONS[i % len(EXTENSIONS)]}"
+        file_path.write_bytes(b"x" * (i % 512))
+        if i % 2:
+            os.utime(file_path, (old_mtime, old_mtime))
+    
+    # 除外対象のディレクトリも配置しておく
+    for excluded in ["node_modules", ".git", "__pycache__"]:
+        (root / excluded).mkdir(exist_ok=True)
+        (root / excluded / "ignored.js").write_bytes(b"x")
+
+
+def run(sizes: List[int] = SIZES, repeat: int = 3) -> Dict[str, Any]:
+    """各ツリー規模でスキャンと日報構造生成を計測し、ケース名をキーとする結果を返す"""
+    module = load_module(REPORT_SCRIPT, "bench_daily_report")
+    results = {}
+    
+    for files in sizes:
+        with tempfile.TemporaryDirectory(prefix="agentdev-bench-report-") as tmp:
+            root = Path(tmp)
+            generate_tree(root, files)
+            generator = module.DailyReportGenerator(root)
+            
+            results[f"report/scan_recent_files/{files}"] = measure(generator.scan_recent_files, repeat)
+            results[f"report/create_report_structure/{files}"] = measure(
+                lambda: generator.create_report_structure("Benchmark"), repeat
+            )
+    
+    return results
+
+
+def main() -> int:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="日報生成ベンチマーク")
+    parser.add_argument("--sizes", type=lambda s: [int(n) for n in s.split(",")], default=SIZES,
+                        help="ツリーのファイル数（カンマ区切り）")
+    parser.add_argument("--repeat", type=int, default=3, help="ケースごとの計測回数")
+    args = parser.parse_args()
+    
+    print(json.dumps(run(args.sizes, args.repeat), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+MCP Server Startup Benchmark
+MCPサーバーの起動時間（プロセス起動〜stdio上の initialize / tools/list 応答）を計測する回帰ガード
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from common import SERVERS
+
+# 起動経路で読み込まれてはならない重いモジュール
+HEAVY_MODULES = ["google.generativeai"]
+
+PROTOCOL_VERSION = "2024-11-05"
+IMPORT_MARKER = "agentdev-bench-heavy-import"
+
+# サーバーを __main__ として起動し、重いモジュールの読み込みを stderr に通知するランチャー
+LAUNCHER = """
+import runpy, sys
+server_path, heavy = sys.argv[1], set(sys.argv[2:])
+
+class HeavyImportWatcher:
+    def find_spec(self, name, path=None, target=None):
+        if name in heavy:
+            sys.stderr.write("%s %s\\n" % (MARKER, name))
+            sys.stderr.flush()
+        return None
+
+sys.meta_path.insert(0, HeavyImportWatcher())
+sys.argv = [server_path]
+sys.path[0] = server_path.rsplit("/", 1)[0]
+runpy.run_path(server_path, run_name="__main__")
+""".replace("MARKER", repr(IMPORT_MARKER))
+
+
+def _send(process: subprocess.Popen, message: Dict[str, Any]) -> None:
+    process.stdin.write(json.dumps(message) + "\n")
+    process.stdin.flush()
+
+
+def _receive(process: subprocess.Popen, request_id: int) -> Dict[str, Any]:
+    """指定したIDの応答が届くまで stdout を読み進める"""
+    while True:
+        line = process.stdout.readline()
+        if not line:
+            raise RuntimeError("Server closed stdout before responding")
+        message = json.loads(line)
+        if message.get("id") == request_id:
+            if "error" in message:
+                raise RuntimeError(f"Server returned error: {message['error']}")
+            return message
+
+
+def probe_server(server_path: Path, timeout: float = 60) -> Dict[str, Any]:
+    """サーバーを起動して initialize → tools/list を行い、各応答までの時間を計測"""
+    env = dict(os.environ)
+    # Gemini クライアントが遅延生成されることを確認するため、ダミーのAPIキーでエージェントを有効化する
+    env.setdefault("GEMINI_API_KEY", "agentdev-bench-dummy-key")
+    
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-c", LAUNCHER, str(server_path), *HEAVY_MODULES],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, env=env
+    )
+    watchdog = threading.Timer(timeout, process.kill)
+    watchdog.start()
+    
+    try:
+        _send(process, {
+            "jsonrpc": "2.0", "id": 1, "method": "initialize",
+            "params": {
+                "protocolVersion": PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "agentdev-bench", "version": "1.0.0"},
+            },
+        })
+        _receive(process, 1)
+        initialized = time.perf_counter()
+        
+        _send(process, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        _send(process, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        tools = _receive(process, 2)["result"]["tools"]
+        ready = time.perf_counter()
+    except Exception:
+        process.kill()
+        _, stderr = process.communicate()
+        raise RuntimeError(f"Startup probe failed for {server_path}:\n{stderr}")
+    finally:
+        watchdog.cancel()
+    
+    # tools/list 応答直後に stdin を閉じて終了させ、それまでの重いモジュール読み込みを確認する
+    _, stderr = process.communicate(timeout=timeout)
+    heavy = sorted({
+        line.split()[1] for line in stderr.splitlines()
+        if line.startswith(IMPORT_MARKER + " ")
+    })
+    
+    return {
+        "initialize_ms": (initialized - start) * 1000,
+        "ready_ms": (ready - start) * 1000,
+        "tools": len(tools),
+        "heavy_modules": heavy,
+    }
+
+
+def measure_server(server_path: Path, runs: int) -> Dict[str, Any]:
+    """サーバーを新しいプロセスで繰り返し起動し、tools/list 応答までの時間を計測"""
+    samples: List[Dict[str, Any]] = [probe_server(server_path) for _ in range(runs)]
+    
+    return {
+        "runs": runs,
+        "median_ms": statistics.median(s["ready_ms"] for s in samples),
+        "min_ms": min(s["ready_ms"] for s in samples),
+        "max_ms": max(s["ready_ms"] for s in samples),
+        "initialize_ms_median": statistics.median(s["initialize_ms"] for s in samples),
+        "tools": samples[-1]["tools"],
+        "heavy_modules": sorted({m for s in samples for m in s["heavy_modules"]}),
+    }
+
+
+def run(runs: int = 5) -> Dict[str, Any]:
+    """全サーバーの起動時間を計測し、ケース名をキーとする結果を返す"""
+    return {
+        f"startup/{name}": measure_server(path, runs)
+        for name, path in sorted(SERVERS.items())
+    }
+
+
+def main() -> int:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="MCPサーバー起動時間ベンチマーク")
+    parser.add_argument("--runs", type=int, default=5, help="サーバーごとの計測回数")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="tools/list応答までの中央値の上限（ミリ秒）")
+    parser.add_argument("--server", choices=sorted(SERVERS), action="append",
+                        help="計測対象のサーバー（省略時は全て）")
+    args = parser.parse_args()
+    
+    results = {}
+    failures = []
+    
+    for name in args.server or sorted(SERVERS):
+        stats = measure_server(SERVERS[name], args.runs)
+        results[name] = stats
+        
+        if stats["heavy_modules"]:
+            failures.append(f"{name}: heavy modules loaded at startup: {', '.join(stats['heavy_modules'])}")
+        if args.max_ms is not None and stats["median_ms"] > args.max_ms:
+            failures.append(f"{name}: ready in {stats['median_ms']:.1f}ms (limit {args.max_ms:.1f}ms)")
+    
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
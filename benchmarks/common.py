@@ -0,0 +1,157 @@
+"""
+Benchmark Common Utilities
+ベンチマーク共通処理（モジュール読み込み・計測・ベースライン比較）
+"""
+
+import asyncio
+import importlib.util
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+ROOT_PATH = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+SERVERS = {
+    "local-tools": ROOT_PATH / "mcp-servers" / "local-tools" / "development_server.py",
+    "gemini-test-agent": ROOT_PATH / "mcp-servers" / "gemini-test-agent" / "server.py",
+}
+REPORT_SCRIPT = ROOT_PATH / "scripts" / "create-daily-report.py"
+
+
+def load_module(path: Path, name: str):
+    """ハイフンを含むパスのスクリプトをモジュールとして読み込む"""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, Any]:
+    """計測値（ミリ秒）の統計を返す"""
+    return {
+        "runs": len(samples_ms),
+        "median_ms": statistics.median(samples_ms),
+        "min_ms": min(samples_ms),
+        "max_ms": max(samples_ms),
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """同期関数を繰り返し実行して計測（setupは計測対象外）"""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def measure_async(factory: Callable[[], Awaitable[Any]], repeat: int,
+                  setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """コルーチンを繰り返し実行して計測（setupは計測対象外）"""
+    async def run() -> List[float]:
+        samples = []
+        for _ in range(repeat):
+            if setup:
+                setup()
+            start = time.perf_counter()
+            await factory()
+            samples.append((time.perf_counter() - start) * 1000)
+        return samples
+    
+    return summarize(asyncio.run(run()))
+
+
+def environment_info() -> Dict[str, str]:
+    """計測環境の情報を収集"""
+    return {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def save_results(results: Dict[str, Any], path: Path) -> None:
+    """計測結果をJSONとして保存"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def load_results(path: Path) -> Optional[Dict[str, Any]]:
+    """保存済みの計測結果を読み込む（存在しない場合はNone）"""
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float, min_delta_ms: float = 1.0) -> List[Dict[str, Any]]:
+    """
+    ベースラインと中央値を比較し、ケースごとの変化率を返す
+
+    変化率が threshold を超え、かつ悪化幅が min_delta_ms を超えた場合のみ回帰とみなす
+    （1ms未満のケースで計測ノイズを回帰と誤判定しないため）
+    """
+    comparison = []
+    baseline_cases = baseline.get("results", {})
+    
+    for case, stats in sorted(current.get("results", {}).items()):
+        base = baseline_cases.get(case)
+        if not base or "median_ms" not in base or "median_ms" not in stats:
+            continue
+        
+        delta_ms = stats["median_ms"] - base["median_ms"]
+        change = delta_ms / base["median_ms"] if base["median_ms"] else 0.0
+        comparison.append({
+            "case": case,
+            "baseline_ms": base["median_ms"],
+            "current_ms": stats["median_ms"],
+            "delta_ms": delta_ms,
+            "change": change,
+            "regression": change > threshold and delta_ms > min_delta_ms,
+        })
+    
+    return comparison
+
+
+def skipped_cases(results: Dict[str, Any]) -> Dict[str, str]:
+    """ツールが利用できずに計測をスキップしたケースと理由を返す"""
+    return {
+        case: stats["skipped"]
+        for case, stats in sorted(results.items())
+        if "skipped" in stats
+    }
+
+
+def missing_cases(current: Dict[str, Any], baseline: Dict[str, Any],
+                  suites: List[str]) -> List[str]:
+    """実行したスイートのうち、ベースラインに存在するが今回計測されなかったケースを返す"""
+    current_cases = current.get("results", {})
+    return [
+        case for case in sorted(baseline.get("results", {}))
+        if case.split("/", 1)[0] in suites and "median_ms" not in current_cases.get(case, {})
+    ]
+
+
+def print_comparison(comparison: List[Dict[str, Any]]) -> None:
+    """比較結果を表形式で出力"""
+    for row in comparison:
+        mark = "REGRESSION" if row["regression"] else "ok"
+        print(
+            f"{row['case']:<60} {row['baseline_ms']:>10.2f}ms -> {row['current_ms']:>10.2f}ms "
+            f"({row['change'] * 100:+6.1f}%) {mark}",
+            file=sys.stderr
+        )
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+AgentDev Benchmark Runner
+全ベンチマークを実行し、JSON出力とベースライン比較を行う
+
+使い方:
+    python benchmarks/run_benchmarks.py --output bench-results.json
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from common import (
+    BASELINE_PATH, compare_results, environment_info, load_results,
+    missing_cases, print_comparison, save_results, skipped_cases
+)
+
+SUITES = ["startup", "tools", "report"]
+
+
+def main() -> int:
+    """メイン関数"""
+    parser = argparse.ArgumentParser(description="AgentDev ベンチマーク一括実行")
+    parser.add_argument("--suite", choices=SUITES, action="append",
+                        help="実行するスイート（省略時は全て）")
+    parser.add_argument("--repeat", type=int, default=3, help="ケースごとの計測回数")
+    parser.add_argument("--report-sizes", type=lambda s: [int(n) for n in s.split(",")],
+                        default=None, help="日報ベンチのツリーのファイル数（カンマ区切り）")
+    parser.add_argument("--stub-latency-ms", type=float, default=0.0,
+                        help="スタブGeminiモデルの擬似応答遅延（ミリ秒）")
+    parser.add_argument("--output", type=Path, default=Path("bench-results.json"),
+                        help="計測結果の出力先JSON")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH,
+                        help="比較対象のベースラインJSON")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="回帰とみなす中央値の悪化率（0.10 = 10%%）")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0,
+                        help="回帰とみなす中央値の最小悪化幅（ミリ秒）。これ未満の変化は無視する")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="今回の結果でベースラインを上書き")
+    args = parser.parse_args()
+    
+    suites = args.suite or SUITES
+    results = {}
+    
+    # 重い依存を持つスイートは必要なときだけ読み込む
+    if "startup" in suites:
+        import bench_startup
+        results.update(bench_startup.run(args.repeat))
+    if "tools" in suites:
+        import bench_tools
+        results.update(bench_tools.run(args.repeat, args.stub_latency_ms))
+    if "report" in suites:
+        import bench_report
+        if args.report_sizes:
+            results.update(bench_report.run(args.report_sizes, args.repeat))
+        else:
+            results.update(bench_report.run(repeat=args.repeat))
+    
+    current = {
+        "environment": environment_info(),
+        "results": results,
+        "unavailable": skipped_cases(results),
+    }
+    failures = []
+    
+    for case, reason in current["unavailable"].items():
+        print(f"SKIP {case}: {reason}", file=sys.stderr)
+    
+    # 起動経路で重いモジュールが読み込まれた場合は回帰として扱う
+    for case, stats in sorted(results.items()):
+        if stats.get("heavy_modules"):
+            failures.append(f"{case}: heavy modules loaded at startup: {', '.join(stats['heavy_modules'])}")
+    
+    if args.update_baseline:
+        if failures:
+            current["failures"] = failures
+            save_results(current, args.output)
+            for failure in failures:
+                print(f"FAIL {failure}", file=sys.stderr)
+            print("Baseline not updated", file=sys.stderr)
+            return 1
+        save_results(current, args.output)
+        save_results(current, args.baseline)
+        print(f"Results saved: {args.output}", file=sys.stderr)
+        print(f"Baseline updated: {args.baseline}", file=sys.stderr)
+        return 0
+    
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print(f"No baseline found at {args.baseline}; run with --update-baseline to create one", file=sys.stderr)
+    else:
+        comparison = compare_results(current, baseline, args.threshold, args.min_delta_ms)
+        current["comparison"] = comparison
+        print_comparison(comparison)
+        
+        # 比較対象が減ったまま合格しないよう、欠落ケースも失敗として扱う
+        current["missing"] = missing_cases(current, baseline, suites)
+        for case in current["missing"]:
+            failures.append(f"{case}: present in baseline but not measured")
+        for row in comparison:
+            if row["regression"]:
+                failures.append(f"{row['case']}: {row['change'] * 100:+.1f}% slower than baseline")
+    
+    current["failures"] = failures
+    save_results(current, args.output)
+    print(f"Results saved: {args.output}", file=sys.stderr)
+    
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
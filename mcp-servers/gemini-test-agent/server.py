@@ -7,26 +7,56 @@ Gemini Test Agent MCP Server
 import asyncio
 import json
 import logging
+import sys
+import threading
+from pathlib import Path
 from typing import Any, Dict, List, Optional
-import google.generativeai as genai
 from mcp.server.models import InitializationOptions
 from mcp.server import NotificationOptions, Server
-from mcp.types import (
-    Resource, Tool, TextContent, ImageContent, EmbeddedResource
-)
 import mcp.types as types
+from mcp.types import Tool
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+from tool_metrics import ToolMetrics
+from tool_profiler import PROFILE_SCHEMA, ToolProfiler, profile_worker
 
 # ロギング設定
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("gemini-test-agent")
+TOOL_NAMES = ("validate_test_code", "suggest_test_cases")
+metrics = ToolMetrics("gemini-test-agent", known_tools=TOOL_NAMES)
+profiler = ToolProfiler("gemini-test-agent")
+
+MODEL_NAME = "gemini-2.5-pro"
 
 class GeminiTestAgent:
     """Gemini 2.5 Proを使用したテスト検証エージェント"""
     
     def __init__(self, api_key: str):
         self.api_key = api_key
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-pro')
+        # google.generativeai は読み込みが重いため、初回リクエストまで遅延させる
+        self._model = None
+        self._model_lock = threading.Lock()
+    
+    @property
+    def model(self):
+        """Geminiモデルを初回アクセス時に生成して返す"""
+        metrics.record_cache("gemini_client", hit=self._model is not None)
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    import google.generativeai as genai
+                    genai.configure(api_key=self.api_key)
+                    self._model = genai.GenerativeModel(MODEL_NAME)
+        return self._model
+    
+    def _generate(self, prompt: str):
+        """ワーカースレッド上でモデル生成と推論を行う"""
+        # cProfile はイベントループではなく、実処理が走るこのワーカースレッド上で有効化する
+        with profile_worker():
+            model = self.model
+            with metrics.phase("gemini"):
+                return model.generate_content(prompt)
         
     async def validate_test_code(self, code: str, test_code: str) -> Dict[str, Any]:
         """
@@ -68,9 +98,7 @@ class GeminiTestAgent:
         """
         
         try:
-            response = await asyncio.to_thread(
-                self.model.generate_content, prompt
-            )
+            response = await asyncio.to_thread(self._generate, prompt)
             
             # JSONレスポンスを解析
             response_text = response.text
@@ -85,6 +113,7 @@ class GeminiTestAgent:
             
         except Exception as e:
             logger.error(f"Gemini API error: {e}")
+            metrics.mark_error()
             return {
                 "score": 0,
                 "issues": [
@@ -124,13 +153,12 @@ class GeminiTestAgent:
         """
         
         try:
-            response = await asyncio.to_thread(
-                self.model.generate_content, prompt
-            )
+            response = await asyncio.to_thread(self._generate, prompt)
             result = json.loads(response.text)
             return result.get("test_cases", [])
         except Exception as e:
             logger.error(f"Test case suggestion error: {e}")
+            metrics.mark_error()
             return []
 
 # MCPサーバー設定
@@ -154,7 +182,8 @@ async def handle_list_tools() -> List[Tool]:
                     "test_code": {
                         "type": "string", 
                         "description": "テストコード"
-                    }
+                    },
+                    "profile": PROFILE_SCHEMA
                 },
                 "required": ["code", "test_code"]
             }
@@ -168,10 +197,19 @@ async def handle_list_tools() -> List[Tool]:
                     "code": {
                         "type": "string",
                         "description": "テストケースを生成するコード"
-                    }
+                    },
+                    "profile": PROFILE_SCHEMA
                 },
                 "required": ["code"]
             }
+        ),
+        Tool(
+            name="get_metrics",
+            description="ツール呼び出しのレイテンシ・エラー数などのメトリクスを取得",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
         )
     ]
 
@@ -180,38 +218,63 @@ async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.T
     """ツール呼び出しの処理"""
     global gemini_agent
     
-    if gemini_agent is None:
-        return [types.TextContent(
-            type="text", 
-            text="Error: Gemini API key not configured"
-        )]
-    
-    if name == "validate_test_code":
-        code = arguments.get("code", "")
-        test_code = arguments.get("test_code", "")
-        
-        result = await gemini_agent.validate_test_code(code, test_code)
-        
+    if name == "get_metrics":
+        metrics.maybe_write_textfile(force=True)
         return [types.TextContent(
             type="text",
-            text=json.dumps(result, ensure_ascii=False, indent=2)
+            text=json.dumps(metrics.snapshot(), ensure_ascii=False, indent=2)
         )]
+    
+    with metrics.track_call(name):
+        if gemini_agent is None:
+            metrics.mark_error()
+            return [types.TextContent(
+                type="text", 
+                text="Error: Gemini API key not configured"
+            )]
         
-    elif name == "suggest_test_cases":
-        code = arguments.get("code", "")
-        
-        result = await gemini_agent.suggest_test_cases(code)
+        if name == "validate_test_code":
+            code = arguments.get("code", "")
+            test_code = arguments.get("test_code", "")
+            
+            with profiler.profile(name, arguments.get("profile"), threaded=True) as profile, metrics.phase("tool"):
+                result = await gemini_agent.validate_test_code(code, test_code)
+            
+            if profile is not None:
+                result["profile"] = profile.describe()
+            
+            with metrics.phase("serialize"):
+                text = json.dumps(result, ensure_ascii=False, indent=2)
+            
+            return [types.TextContent(
+                type="text",
+                text=text
+            )]
+            
+        elif name == "suggest_test_cases":
+            code = arguments.get("code", "")
+            
+            with profiler.profile(name, arguments.get("profile"), threaded=True) as profile, metrics.phase("tool"):
+                result = await gemini_agent.suggest_test_cases(code)
+            
+            output = {"test_cases": result}
+            if profile is not None:
+                output["profile"] = profile.describe()
+            
+            with metrics.phase("serialize"):
+                text = json.dumps(output, ensure_ascii=False, indent=2)
+            
+            return [types.TextContent(
+                type="text",
+                text=text
+            )]
         
-        return [types.TextContent(
-            type="text",
-            text=json.dumps({"test_cases": result}, ensure_ascii=False, indent=2)
-        )]
-    
-    else:
-        return [types.TextContent(
-            type="text",
-            text=f"Unknown tool: {name}"
-        )]
+        else:
+            metrics.mark_error()
+            return [types.TextContent(
+                type="text",
+                text=f"Unknown tool: {name}"
+            )]
 
 async def main():
     """メイン関数"""
@@ -9,13 +9,35 @@ import json
 import os
 import subprocess
 import sys
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
 from mcp.server.models import InitializationOptions
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "shared"))
+from tool_metrics import ToolMetrics
+from tool_profiler import PROFILE_SCHEMA, ToolProfiler, record_subprocess
+
+TOOL_NAMES = ("run_linter", "format_code", "run_tests")
+
 server = Server("local-development-tools")
+metrics = ToolMetrics("local-development-tools", known_tools=TOOL_NAMES)
+profiler = ToolProfiler("local-development-tools")
+
+
+def run_command(command: List[str], timeout: int) -> subprocess.CompletedProcess:
+    """サブプロセスを実行し、所要時間を subprocess フェーズおよびプロファイルに記録"""
+    start = time.perf_counter()
+    returncode = None
+    try:
+        with metrics.phase("subprocess"):
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+        returncode = result.returncode
+        return result
+    finally:
+        record_subprocess(command, time.perf_counter() - start, returncode)
 
 class DevelopmentTools:
     """開発支援ツール群"""
@@ -42,15 +64,9 @@ class DevelopmentTools:
         
         try:
             if linter_type == "pylint":
-                result = subprocess.run(
-                    [sys.executable, "-m", "pylint", str(file_path)],
-                    capture_output=True, text=True, timeout=30
-                )
+                result = run_command([sys.executable, "-m", "pylint", str(file_path)], timeout=30)
             elif linter_type == "eslint":
-                result = subprocess.run(
-                    ["npx", "eslint", str(file_path)],
-                    capture_output=True, text=True, timeout=30
-                )
+                result = run_command(["npx", "eslint", str(file_path)], timeout=30)
             else:
                 return {"error": f"Unsupported linter: {linter_type}"}
             
@@ -98,15 +114,9 @@ class DevelopmentTools:
             
             # フォーマット実行
             if formatter == "black":
-                result = subprocess.run(
-                    [sys.executable, "-m", "black", str(file_path)],
-                    capture_output=True, text=True, timeout=30
-                )
+                result = run_command([sys.executable, "-m", "black", str(file_path)], timeout=30)
             elif formatter == "prettier":
-                result = subprocess.run(
-                    ["npx", "prettier", "--write", str(file_path)],
-                    capture_output=True, text=True, timeout=30
-                )
+                result = run_command(["npx", "prettier", "--write", str(file_path)], timeout=30)
             else:
                 return {"error": f"Unsupported formatter: {formatter}"}
             
@@ -161,15 +171,9 @@ class DevelopmentTools:
                         test_framework = "pytest"  # デフォルト
             
             if test_framework == "pytest":
-                result = subprocess.run(
-                    [sys.executable, "-m", "pytest", str(test_path), "-v", "--tb=short"],
-                    capture_output=True, text=True, timeout=120
-                )
+                result = run_command([sys.executable, "-m", "pytest", str(test_path), "-v", "--tb=short"], timeout=120)
             elif test_framework == "jest":
-                result = subprocess.run(
-                    ["npx", "jest", str(test_path)],
-                    capture_output=True, text=True, timeout=120
-                )
+                result = run_command(["npx", "jest", str(test_path)], timeout=120)
             else:
                 return {"error": f"Unsupported test framework: {test_framework}"}
             
@@ -205,7 +209,8 @@ async def handle_list_tools() -> List[types.Tool]:
                         "type": "string",
                         "description": "使用するリンターの種類 (auto/pylint/eslint)",
                         "default": "auto"
-                    }
+                    },
+                    "profile": PROFILE_SCHEMA
                 },
                 "required": ["file_path"]
             }
@@ -224,7 +229,8 @@ async def handle_list_tools() -> List[types.Tool]:
                         "type": "string",
                         "description": "使用するフォーマッターの種類 (auto/black/prettier)",
                         "default": "auto"
-                    }
+                    },
+                    "profile": PROFILE_SCHEMA
                 },
                 "required": ["file_path"]
             }
@@ -243,47 +249,74 @@ async def handle_list_tools() -> List[types.Tool]:
                         "type": "string",
                         "description": "使用するテストフレームワーク (auto/pytest/jest)",
                         "default": "auto"
-                    }
+                    },
+                    "profile": PROFILE_SCHEMA
                 },
                 "required": ["test_path"]
             }
+        ),
+        types.Tool(
+            name="get_metrics",
+            description="ツール呼び出しのレイテンシ・エラー数などのメトリクスを取得",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
         )
     ]
 
 @server.call_tool()
 async def handle_call_tool(name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
     """ツール呼び出しの処理"""
-    tools = DevelopmentTools()
-    
-    try:
-        if name == "run_linter":
-            result = await tools.run_linter(
-                arguments.get("file_path", ""),
-                arguments.get("linter_type", "auto")
-            )
-        elif name == "format_code":
-            result = await tools.format_code(
-                arguments.get("file_path", ""),
-                arguments.get("formatter", "auto")
-            )
-        elif name == "run_tests":
-            result = await tools.run_tests(
-                arguments.get("test_path", ""),
-                arguments.get("test_framework", "auto")
-            )
-        else:
-            result = {"error": f"Unknown tool: {name}"}
-        
+    if name == "get_metrics":
+        metrics.maybe_write_textfile(force=True)
         return [types.TextContent(
             type="text",
-            text=json.dumps(result, ensure_ascii=False, indent=2)
+            text=json.dumps(metrics.snapshot(), ensure_ascii=False, indent=2)
         )]
+    
+    with metrics.track_call(name):
+        tools = DevelopmentTools()
         
-    except Exception as e:
-        return [types.TextContent(
-            type="text",
-            text=json.dumps({"error": f"Tool execution failed: {str(e)}"}, ensure_ascii=False, indent=2)
-        )]
+        try:
+            with profiler.profile(metrics.label(name), arguments.get("profile")) as profile, metrics.phase("tool"):
+                if name == "run_linter":
+                    result = await tools.run_linter(
+                        arguments.get("file_path", ""),
+                        arguments.get("linter_type", "auto")
+                    )
+                elif name == "format_code":
+                    result = await tools.format_code(
+                        arguments.get("file_path", ""),
+                        arguments.get("formatter", "auto")
+                    )
+                elif name == "run_tests":
+                    result = await tools.run_tests(
+                        arguments.get("test_path", ""),
+                        arguments.get("test_framework", "auto")
+                    )
+                else:
+                    result = {"error": f"Unknown tool: {name}"}
+            
+            if "error" in result:
+                metrics.mark_error()
+            if profile is not None:
+                result["profile"] = profile.describe()
+            
+            with metrics.phase("serialize"):
+                text = json.dumps(result, ensure_ascii=False, indent=2)
+            
+            return [types.TextContent(
+                type="text",
+                text=text
+            )]
+            
+        except Exception as e:
+            metrics.mark_error()
+            return [types.TextContent(
+                type="text",
+                text=json.dumps({"error": f"Tool execution failed: {str(e)}"}, ensure_ascii=False, indent=2)
+            )]
 
 async def main():
     """メイン関数"""
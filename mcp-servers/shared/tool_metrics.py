@@ -0,0 +1,283 @@
+"""
+Tool Metrics for MCP Servers
+MCPツール呼び出しのレイテンシ・スループット計測（標準ライブラリのみ）
+
+各サーバーで ToolMetrics を1つ生成し、handle_call_tool を track_call で囲む。
+フェーズ（subprocess / gemini / serialize など）は phase で計測する。
+環境変数 AGENTDEV_METRICS_FILE を設定すると Prometheus テキスト形式で書き出す。
+"""
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# レイテンシヒストグラムのバケット境界（秒）
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+UNKNOWN_TOOL = "unknown"
+
+DEFAULT_WRITE_INTERVAL = 5.0
+
+logger = logging.getLogger("agentdev-metrics")
+
+# 実行中のツール呼び出し（非同期タスク・to_threadにも引き継がれる）
+_current_call: ContextVar[Optional["_CallState"]] = ContextVar("agentdev_tool_call", default=None)
+
+
+class _CallState:
+    """1回のツール呼び出しの状態"""
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.failed = False
+
+
+class Histogram:
+    """固定バケットのレイテンシヒストグラム"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Prometheus形式の累積バケット（+Infを含む）"""
+        result = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            result.append((repr(bound), running))
+        result.append(("+Inf", self.count))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_seconds": self.total,
+            "avg_ms": (self.total / self.count * 1000) if self.count else 0.0,
+            "buckets": dict(self.cumulative()),
+        }
+
+
+class ToolMetrics:
+    """MCPサーバー単位のツールメトリクス"""
+
+    def __init__(self, server_name: str, known_tools: Optional[Iterable[str]] = None,
+                 textfile: Optional[str] = None, write_interval: Optional[float] = None):
+        self.server_name = server_name
+        # 未知のツール名はラベルの種類が際限なく増えないよう "unknown" にまとめる
+        self.known_tools = frozenset(known_tools) if known_tools is not None else None
+        self.textfile = textfile if textfile is not None else os.getenv("AGENTDEV_METRICS_FILE")
+        self.write_interval = write_interval if write_interval is not None else _env_float(
+            "AGENTDEV_METRICS_INTERVAL", DEFAULT_WRITE_INTERVAL
+        )
+        self.started_at = time.time()
+
+        self._lock = threading.Lock()
+        self._calls: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._latency: Dict[Tuple[str, str], Histogram] = {}
+        self._cache: Dict[str, Dict[str, int]] = {}
+        self._last_write = 0.0
+        self._write_failed = False
+
+    def label(self, tool: str) -> str:
+        """メトリクスのラベルとして使うツール名（未知のツールは "unknown"）"""
+        if self.known_tools is not None and tool not in self.known_tools:
+            return UNKNOWN_TOOL
+        return tool
+
+    @contextmanager
+    def track_call(self, tool: str) -> Iterator[None]:
+        """ツール呼び出し全体を計測（呼び出し数・エラー数・実行中数・totalフェーズ）"""
+        tool = self.label(tool)
+        state = _CallState(tool)
+        token = _current_call.set(state)
+        with self._lock:
+            self._in_flight[tool] = self._in_flight.get(tool, 0) + 1
+
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            state.failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            _current_call.reset(token)
+            with self._lock:
+                self._in_flight[tool] -= 1
+                self._calls[tool] = self._calls.get(tool, 0) + 1
+                if state.failed:
+                    self._errors[tool] = self._errors.get(tool, 0) + 1
+                self._observe(tool, "total", elapsed)
+            self.maybe_write_textfile()
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """実行中のツール呼び出しに対してフェーズ時間を計測"""
+        state = _current_call.get()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if state is not None:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self._observe(state.tool, phase, elapsed)
+
+    def mark_error(self) -> None:
+        """実行中のツール呼び出しをエラーとして記録"""
+        state = _current_call.get()
+        if state is not None:
+            state.failed = True
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """キャッシュのヒット・ミスを記録"""
+        with self._lock:
+            counts = self._cache.setdefault(cache, {"hit": 0, "miss": 0})
+            counts["hit" if hit else "miss"] += 1
+
+    def _observe(self, tool: str, phase: str, seconds: float) -> None:
+        histogram = self._latency.get((tool, phase))
+        if histogram is None:
+            histogram = self._latency[(tool, phase)] = Histogram()
+        histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """get_metrics ツール向けのJSON互換スナップショット"""
+        with self._lock:
+            uptime = max(time.time() - self.started_at, 1e-9)
+            tools: Dict[str, Any] = {}
+            for tool in sorted(set(self._calls) | set(self._in_flight)):
+                tools[tool] = {
+                    "calls": self._calls.get(tool, 0),
+                    "errors": self._errors.get(tool, 0),
+                    "in_flight": self._in_flight.get(tool, 0),
+                    "calls_per_second": self._calls.get(tool, 0) / uptime,
+                    "latency": {
+                        phase: histogram.to_dict()
+                        for (name, phase), histogram in sorted(self._latency.items())
+                        if name == tool
+                    },
+                }
+
+            cache = {
+                name: {
+                    **counts,
+                    "hit_ratio": counts["hit"] / (counts["hit"] + counts["miss"])
+                    if counts["hit"] + counts["miss"] else 0.0,
+                }
+                for name, counts in sorted(self._cache.items())
+            }
+
+        return {
+            "server": self.server_name,
+            "uptime_seconds": uptime,
+            "tools": tools,
+            "cache": cache,
+        }
+
+    def render_prometheus(self) -> str:
+        """Prometheusテキスト形式で出力"""
+        server = _escape(self.server_name)
+        lines = []
+
+        with self._lock:
+            lines.append("# HELP agentdev_tool_calls_total Total MCP tool calls.")
+            lines.append("# TYPE agentdev_tool_calls_total counter")
+            for tool, count in sorted(self._calls.items()):
+                lines.append(f'agentdev_tool_calls_total{{server="{server}",tool="{_escape(tool)}"}} {count}')
+
+            lines.append("# HELP agentdev_tool_errors_total Total failed MCP tool calls.")
+            lines.append("# TYPE agentdev_tool_errors_total counter")
+            for tool, count in sorted(self._errors.items()):
+                lines.append(f'agentdev_tool_errors_total{{server="{server}",tool="{_escape(tool)}"}} {count}')
+
+            lines.append("# HELP agentdev_tool_in_flight MCP tool calls currently executing.")
+            lines.append("# TYPE agentdev_tool_in_flight gauge")
+            for tool, count in sorted(self._in_flight.items()):
+                lines.append(f'agentdev_tool_in_flight{{server="{server}",tool="{_escape(tool)}"}} {count}')
+
+            lines.append("# HELP agentdev_tool_phase_duration_seconds MCP tool call latency by phase.")
+            lines.append("# TYPE agentdev_tool_phase_duration_seconds histogram")
+            for (tool, phase), histogram in sorted(self._latency.items()):
+                labels = f'server="{server}",tool="{_escape(tool)}",phase="{_escape(phase)}"'
+                for bound, count in histogram.cumulative():
+                    lines.append(f'agentdev_tool_phase_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f"agentdev_tool_phase_duration_seconds_sum{{{labels}}} {histogram.total}")
+                lines.append(f"agentdev_tool_phase_duration_seconds_count{{{labels}}} {histogram.count}")
+
+            lines.append("# HELP agentdev_cache_requests_total Cache lookups by result.")
+            lines.append("# TYPE agentdev_cache_requests_total counter")
+            for cache, counts in sorted(self._cache.items()):
+                for result in ("hit", "miss"):
+                    lines.append(
+                        f'agentdev_cache_requests_total{{server="{server}",cache="{_escape(cache)}",result="{result}"}} {counts[result]}'
+                    )
+
+        return "\n".join(lines) + "\n"
+
+    def maybe_write_textfile(self, force: bool = False) -> None:
+        """設定されていればPrometheusテキストファイルを書き出す（書き込み間隔で間引く）"""
+        if not self.textfile:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._last_write < self.write_interval:
+            return
+        self._last_write = now
+
+        # node_exporter が書き込み途中のファイルを読まないよう、一時ファイル経由で置き換える
+        tmp_path = f"{self.textfile}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render_prometheus())
+            os.replace(tmp_path, self.textfile)
+        except OSError as e:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            # 呼び出しのたびにログが溢れないよう、連続した失敗は最初の1回だけ警告する
+            if not self._write_failed:
+                logger.warning(f"Failed to write metrics file {self.textfile}: {e}")
+            self._write_failed = True
+        else:
+            if self._write_failed:
+                logger.info(f"Metrics file writable again: {self.textfile}")
+            self._write_failed = False
+
+
+def _env_float(name: str, default: float) -> float:
+    """環境変数を数値として読み込む（不正な値は警告して既定値を使う）"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Invalid {name}={value!r}; using default {default}")
+        return default
+
+
+def _escape(value: str) -> str:
+    """Prometheusラベル値のエスケープ"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
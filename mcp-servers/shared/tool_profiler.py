@@ -0,0 +1,339 @@
+"""
+Tool Profiler for MCP Servers
+個別のツール呼び出しを対象にしたオンデマンドプロファイリング（標準ライブラリのみ）
+
+有効化の方法:
+    - 呼び出し単位: ツール引数に "profile": true（または "cprofile" / "sample"）を渡す
+      （"profile": false / "off" などで環境変数による有効化を打ち消せる）
+    - 環境変数: AGENTDEV_PROFILE=all もしくはツール名のカンマ区切り
+
+環境変数:
+    AGENTDEV_PROFILE_MODE         cprofile（pstats出力, 既定）| sample（呼び出しを実行するスレッドのみ採取し collapsed stack出力）
+    AGENTDEV_PROFILE_DIR          出力先ディレクトリ（既定: <tmp>/agentdev-profiles）
+    AGENTDEV_PROFILE_KEEP         保持するプロファイル数の上限（既定: 50）
+    AGENTDEV_PROFILE_INTERVAL_MS  sampleモードのサンプリング間隔（既定: 5）
+
+各プロファイルには、ツール名・総実行時間・子サブプロセスの実時間を記録した
+.profile.json サマリーが併せて保存される。保持数の上限を超えた場合に削除されるのは
+このプロファイラが出力したファイルのみ。
+"""
+
+import cProfile
+import itertools
+import json
+import logging
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Union
+
+MODES = ("cprofile", "sample")
+TRUE_VALUES = ("1", "true", "yes", "on")
+FALSE_VALUES = ("0", "false", "no", "off")
+
+# サマリーJSONの拡張子（保持数の管理はこの拡張子を持つファイルのみを対象とする）
+SUMMARY_SUFFIX = ".profile.json"
+
+logger = logging.getLogger("agentdev-profiler")
+
+# 各ツールの inputSchema に追加する呼び出し単位の有効化パラメータ
+PROFILE_SCHEMA = {
+    "type": ["boolean", "string"],
+    "description": "この呼び出しをプロファイルする (true/cprofile/sample)",
+    "default": False
+}
+
+# 実行中のプロファイルセッション（非同期タスク・to_threadにも引き継がれる）
+_current_session: ContextVar[Optional["ProfileSession"]] = ContextVar("agentdev_profile_session", default=None)
+
+# cProfile を同時に使うセッションは1つに限る（Python 3.12以降はプロセス全体で1つのみ有効化可能）
+_cprofile_lock = threading.Lock()
+_sequence = itertools.count(1)
+
+
+def record_subprocess(command: List[str], seconds: float, returncode: Optional[int]) -> None:
+    """プロファイル中のツール呼び出しに子サブプロセスの実時間を記録"""
+    session = _current_session.get()
+    if session is not None:
+        session.subprocesses.append({
+            "command": [str(part) for part in command],
+            "wall_ms": seconds * 1000,
+            "returncode": returncode,
+        })
+
+
+class _StackSampler(threading.Thread):
+    """対象スレッドのスタックを定期的に採取するサンプリングプロファイラ"""
+
+    def __init__(self, interval: float, thread_ids: Set[int]):
+        super().__init__(name="agentdev-profile-sampler", daemon=True)
+        self.interval = interval
+        # 対象のツール呼び出しを実行しているスレッドのみを採取する（呼び出し中に増減する）
+        self.thread_ids = thread_ids
+        self.counts: Dict[str, int] = {}
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id not in self.thread_ids:
+                    continue
+                stack = self._collapse(frame, names.get(thread_id, str(thread_id)))
+                self.counts[stack] = self.counts.get(stack, 0) + 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+    @staticmethod
+    def _collapse(frame, thread_name: str) -> str:
+        """フレームを flamegraph.pl 互換の collapsed stack 形式に変換"""
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+            frame = frame.f_back
+        parts.append(f"thread:{thread_name}")
+        return ";".join(part.replace(";", ",") for part in reversed(parts))
+
+
+class ProfileSession:
+    """1回のツール呼び出しに対するプロファイル結果"""
+
+    def __init__(self, tool: str, mode: str, base_path: Path):
+        self.tool = tool
+        self.mode = mode
+        self.base_path = base_path
+        self.started_at = datetime.now()
+        self.wall_ms = 0.0
+        self.subprocesses: List[Dict[str, Any]] = []
+        # cprofile モードでスレッドごとに取得した cProfile（保存時に結合する）
+        self.profiles: List[cProfile.Profile] = []
+        # sample モードで採取対象とするスレッド
+        self.thread_ids: Set[int] = set()
+
+    @property
+    def stats_path(self) -> Path:
+        """プロファイル本体のパス（pstats または collapsed stack）"""
+        suffix = ".prof" if self.mode == "cprofile" else ".collapsed"
+        return self.base_path.with_name(self.base_path.name + suffix)
+
+    @property
+    def summary_path(self) -> Path:
+        """サマリーJSONのパス"""
+        return self.base_path.with_name(self.base_path.name + SUMMARY_SUFFIX)
+
+    def describe(self) -> Dict[str, str]:
+        """ツール結果に添付するプロファイル出力先"""
+        return {"mode": self.mode, "stats": str(self.stats_path), "summary": str(self.summary_path)}
+
+    def write_stats(self, sampler: Optional[_StackSampler]) -> None:
+        if self.mode == "cprofile":
+            if self.profiles:
+                pstats.Stats(*self.profiles).dump_stats(str(self.stats_path))
+            return
+        with open(self.stats_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(sampler.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+    def write_summary(self) -> None:
+        with open(self.summary_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "tool": self.tool,
+                "mode": self.mode,
+                "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S"),
+                "wall_ms": self.wall_ms,
+                "subprocess_wall_ms": sum(p["wall_ms"] for p in self.subprocesses),
+                "subprocesses": self.subprocesses,
+                "stats": self.stats_path.name,
+            }, f, ensure_ascii=False, indent=2)
+
+
+def _env_number(name: str, default, cast):
+    """環境変数を数値として読み込む（不正な値は警告して既定値を使う）"""
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"Invalid {name}={value!r}; using default {default}")
+        return default
+
+
+@contextmanager
+def profile_worker() -> Iterator[None]:
+    """to_thread などワーカースレッド上の処理を、実行中セッションのプロファイルに含める"""
+    session = _current_session.get()
+    if session is None:
+        yield
+        return
+
+    if session.mode == "sample":
+        thread_id = threading.get_ident()
+        session.thread_ids.add(thread_id)
+        try:
+            yield
+        finally:
+            # スレッドプールのワーカーは再利用されるため、処理後は採取対象から外す
+            session.thread_ids.discard(thread_id)
+        return
+
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except Exception as e:
+        logger.warning(f"Failed to start worker profiler: {e}")
+        yield
+        return
+
+    try:
+        yield
+    finally:
+        profiler.disable()
+        session.profiles.append(profiler)
+
+
+class ToolProfiler:
+    """MCPサーバー単位のプロファイラ設定と出力管理"""
+
+    def __init__(self, server_name: str, directory: Optional[str] = None,
+                 mode: Optional[str] = None, tools: Optional[str] = None,
+                 keep: Optional[int] = None, interval_ms: Optional[float] = None):
+        self.server_name = server_name
+        self.directory = Path(
+            directory or os.getenv("AGENTDEV_PROFILE_DIR")
+            or Path(tempfile.gettempdir()) / "agentdev-profiles"
+        )
+        self.mode = (mode or os.getenv("AGENTDEV_PROFILE_MODE", "cprofile")).strip().lower()
+        if self.mode not in MODES:
+            logger.warning(f"Invalid AGENTDEV_PROFILE_MODE={self.mode!r}; using cprofile")
+            self.mode = "cprofile"
+        self.keep = keep if keep is not None else int(_env_number("AGENTDEV_PROFILE_KEEP", 50, int))
+        self.interval = (interval_ms if interval_ms is not None else _env_number(
+            "AGENTDEV_PROFILE_INTERVAL_MS", 5.0, float
+        )) / 1000
+
+        enabled = tools if tools is not None else os.getenv("AGENTDEV_PROFILE", "")
+        self.tools = {t.strip() for t in enabled.split(",") if t.strip()}
+
+    def resolve_mode(self, tool: str, requested: Union[bool, str, None] = None) -> Optional[str]:
+        """呼び出し単位の指定と環境変数から、使用するモードを決定（無効ならNone）"""
+        if isinstance(requested, str):
+            value = requested.strip().lower()
+            if value in MODES:
+                return value
+            if value in TRUE_VALUES:
+                return self.mode
+            if value in FALSE_VALUES:
+                return None
+        elif requested is True:
+            return self.mode
+        elif requested is False:
+            return None
+
+        if tool in self.tools or {t.lower() for t in self.tools} & {"all", *TRUE_VALUES}:
+            return self.mode
+        return None
+
+    @contextmanager
+    def profile(self, tool: str, requested: Union[bool, str, None] = None,
+                threaded: bool = False) -> Iterator[Optional[ProfileSession]]:
+        """
+        ツール呼び出しを囲み、有効時はプロファイルを保存する（無効時・開始失敗時はNoneを返す）
+
+        通常は呼び出し元のスレッドを計測する。threaded=True の場合はイベントループの
+        スレッドを計測せず、profile_worker で囲んだワーカースレッド上の処理のみを記録する。
+        """
+        mode = self.resolve_mode(tool, requested)
+        if mode is None:
+            yield None
+            return
+
+        locked = False
+        profiler = None
+        sampler = None
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+            if mode == "cprofile":
+                locked = _cprofile_lock.acquire(blocking=False)
+                if not locked:
+                    # 他の呼び出しで cProfile が実行中の場合はサンプリングに切り替える
+                    mode = "sample"
+
+            stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+            base_path = self.directory / f"{self.server_name}-{tool}-{stamp}-{os.getpid()}-{next(_sequence)}"
+            session = ProfileSession(tool, mode, base_path)
+
+            if mode == "sample":
+                if not threaded:
+                    session.thread_ids.add(threading.get_ident())
+                sampler = _StackSampler(self.interval, session.thread_ids)
+                sampler.start()
+            elif not threaded:
+                profiler = cProfile.Profile()
+                profiler.enable()
+                session.profiles.append(profiler)
+        except Exception as e:
+            # プロファイラの準備に失敗してもツール呼び出し自体は継続する
+            logger.warning(f"Profiling disabled for {tool}: {e}")
+            self._stop(profiler, sampler)
+            if locked:
+                _cprofile_lock.release()
+            yield None
+            return
+
+        token = _current_session.set(session)
+        start = time.perf_counter()
+        try:
+            yield session
+        finally:
+            session.wall_ms = (time.perf_counter() - start) * 1000
+            _current_session.reset(token)
+
+            try:
+                self._stop(profiler, sampler)
+                session.write_stats(sampler)
+                session.write_summary()
+                self.enforce_retention()
+            except Exception as e:
+                logger.warning(f"Failed to save profile for {tool}: {e}")
+            finally:
+                if locked:
+                    _cprofile_lock.release()
+
+    @staticmethod
+    def _stop(profiler: Optional[cProfile.Profile], sampler: Optional[_StackSampler]) -> None:
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None and sampler.is_alive():
+            sampler.stop()
+
+    def enforce_retention(self) -> None:
+        """保持数を超えた古いプロファイルを削除（このプロファイラが出力したファイルのみ対象）"""
+        if self.keep <= 0:
+            return
+
+        summaries = sorted(
+            self.directory.glob(f"{self.server_name}-*{SUMMARY_SUFFIX}"),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True
+        )
+        for summary in summaries[self.keep:]:
+            stem = summary.name[:-len(SUMMARY_SUFFIX)]
+            for suffix in (SUMMARY_SUFFIX, ".prof", ".collapsed"):
+                try:
+                    (summary.parent / (stem + suffix)).unlink()
+                except FileNotFoundError:
+                    continue
@@ -5,16 +5,18 @@ Claude用の日報作成支援ツール
 """
 
 import os
+import sys
 import json
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 class DailyReportGenerator:
     """日報生成支援クラス"""
     
-    def __init__(self):
-        self.base_path = Path("/mnt/c/AgentDev")
+    def __init__(self, base_path: Optional[Path] = None):
+        self.base_path = Path(base_path) if base_path else Path("/mnt/c/AgentDev")
         self.reports_path = self.base_path / "daily-reports"
         self.work_logs_path = self.base_path / "work-logs"
         self.templates_path = self.base_path / "templates"
@@ -167,13 +169,22 @@ def main():
     """メイン関数 - Claudeが呼び出し用"""
     generator = DailyReportGenerator()
     
-    # 基本構造を生成してファイルに保存
-    structure = generator.create_report_structure("Script Execution")
+    # 基本構造を生成してファイルに保存（AGENTDEV_PROFILE指定時のみプロファイラを読み込んで計測）
+    profiling = nullcontext()
+    if os.getenv("AGENTDEV_PROFILE"):
+        sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "mcp-servers" / "shared"))
+        from tool_profiler import ToolProfiler
+        profiling = ToolProfiler("daily-report").profile("create_report_structure")
+    
+    with profiling as profile:
+        structure = generator.create_report_structure("Script Execution")
     log_file = generator.save_work_log(structure)
     
     print(f"Work log saved: {log_file}")
     print(f"Recent files analyzed: {structure['analysis']['total_files']}")
     print(f"Report should be saved to: {generator.get_report_filename(structure['session']['date'])}")
+    if profile is not None:
+        print(f"Profile saved: {profile.stats_path}")
     
     return structure
 